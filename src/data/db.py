@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+db.py — Accès à la base SQLite menu_analytics.db.
+
+Ce fichier définit:
+1. connect(): connexion lecture/écriture, ou lecture seule (URI mode=ro) avec un
+   gros mmap et un gros cache de pages pour les audits et les exports
+2. snapshot(): transaction de lecture, pour que plusieurs requêtes voient le même
+   état de la base pendant que les jobs d'ingestion écrivent (mode WAL)
+
+Le chemin par défaut peut être surchargé par la variable MENU_ANALYTICS_DB.
+"""
+
+import sqlite3
+import os
+from contextlib import contextmanager
+from urllib.parse import quote
+
+DB_PATH_ENV = 'MENU_ANALYTICS_DB'
+
+# Réglages de la connexion lecture seule
+READ_ONLY_MMAP_SIZE = 1024 * 1024 * 1024   # 1 Go mappé en mémoire
+READ_ONLY_CACHE_KIB = 256 * 1024           # 256 Mo de cache de pages
+
+
+def resolve_db_path(default: str) -> str:
+    """Retourne le chemin de la base (variable MENU_ANALYTICS_DB sinon `default`)."""
+    return os.environ.get(DB_PATH_ENV) or default
+
+
+def connect(db_path: str, read_only: bool = False, check_same_thread: bool = True) -> sqlite3.Connection:
+    """
+    Ouvre la base.
+
+    En lecture seule, la base est ouverte via l'URI file:...?mode=ro : aucun verrou
+    d'écriture n'est pris, et en mode WAL les lecteurs ne bloquent pas les écrivains.
+    check_same_thread=False permet de partager la connexion entre threads (l'appelant
+    doit alors sérialiser les accès).
+    """
+    if not read_only:
+        return sqlite3.connect(db_path, check_same_thread=check_same_thread)
+
+    uri = f"file:{quote(os.path.abspath(db_path))}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+    conn.execute(f'PRAGMA mmap_size = {READ_ONLY_MMAP_SIZE}')
+    conn.execute(f'PRAGMA cache_size = -{READ_ONLY_CACHE_KIB}')
+    conn.execute('PRAGMA query_only = ON')
+    return conn
+
+
+def is_wal(conn: sqlite3.Connection) -> bool:
+    """True si la base est en mode WAL (lecteurs et écrivains ne se bloquent pas)."""
+    return conn.execute('PRAGMA journal_mode').fetchone()[0].lower() == 'wal'
+
+
+@contextmanager
+def snapshot(conn: sqlite3.Connection):
+    """
+    Exécute un bloc de lectures dans une seule transaction.
+
+    En mode WAL, toutes les requêtes du bloc voient le même instantané de la base,
+    même si un autre processus commite entre-temps. Dans les autres modes (journal
+    de rollback), une transaction longue garderait un verrou SHARED et bloquerait
+    les écrivains : chaque requête lit alors séparément, sans instantané commun.
+    """
+    if not is_wal(conn):
+        print("  ⚠️  Base hors mode WAL : lectures sans instantané commun (pas de verrou long)")
+        yield conn
+        return
+
+    conn.execute('BEGIN')
+    try:
+        yield conn
+    finally:
+        conn.execute('COMMIT')
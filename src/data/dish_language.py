@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+dish_language.py — Étiquette de langue (fr/en) des noms de plats.
+
+Ce fichier définit:
+1. detect_language(): heuristique bon marché (mots-outils, accents) → 'fr' ou 'en'
+2. tag_dish_languages(): calcule la langue une seule fois par plat et la stocke dans
+   la colonne plats.langue (seuls les plats sans étiquette sont traités)
+
+Usage:
+  - Import: from dish_language import detect_language, tag_dish_languages
+"""
+
+import re
+
+LANGUAGES = ('fr', 'en')
+DEFAULT_LANGUAGE = 'fr'
+
+# Mots-outils et marqueurs culinaires fréquents dans les noms de plats
+FRENCH_MARKERS = {
+    "de", "du", "des", "la", "le", "les", "et", "aux", "au", "à", "en", "sur",
+    "façon", "cuit", "cuite", "rôti", "rôtie", "fumé", "fumée", "glacé", "glacée",
+    "comme", "avec", "sans", "poêlé", "poêlée", "jus", "noix",
+}
+ENGLISH_MARKERS = {
+    "and", "with", "the", "of", "in", "on", "from", "served", "style",
+    "roasted", "smoked", "stuffed", "grilled", "braised", "marinated", "crispy", "crunchy",
+    "beef", "pork", "lamb", "chicken", "duck", "cabbage", "squash", "seaweed",
+    "sweet", "red", "black", "white", "green", "cream", "butter",
+}
+
+_TOKEN_RE = re.compile(r"[a-zà-ÿœæ]+(?:'[a-zà-ÿœæ]+)?")
+_ACCENT_RE = re.compile(r"[éèêëàâîïôûùüçœ]")
+
+
+def detect_language(dish_name: str) -> str:
+    """
+    Devine la langue d'un nom de plat.
+
+    Returns:
+        'fr' ou 'en' ('fr' en cas d'égalité : les tables historiques sont françaises)
+    """
+    if not dish_name:
+        return DEFAULT_LANGUAGE
+
+    dish_lower = dish_name.lower()
+    fr_score = 0
+    en_score = 0
+    for token in _TOKEN_RE.findall(dish_lower):
+        # Élisions : d'olive, l'ail
+        if token.startswith(("d'", "l'")):
+            fr_score += 1
+        elif token in FRENCH_MARKERS:
+            fr_score += 1
+        elif token in ENGLISH_MARKERS:
+            en_score += 1
+    if _ACCENT_RE.search(dish_lower):
+        fr_score += 1
+
+    return 'en' if en_score > fr_score else DEFAULT_LANGUAGE
+
+
+def ensure_language_column(conn):
+    """Ajoute la colonne plats.langue si elle n'existe pas encore."""
+    cursor = conn.cursor()
+    cursor.execute('PRAGMA table_info(plats)')
+    if 'langue' not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute('ALTER TABLE plats ADD COLUMN langue TEXT')
+        conn.commit()
+
+
+def tag_dish_languages(conn) -> int:
+    """
+    Étiquette la langue des plats qui n'en ont pas encore.
+
+    Returns:
+        nombre de plats étiquetés
+    """
+    ensure_language_column(conn)
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT id, nom_plat FROM plats WHERE langue IS NULL')
+    updates = [(detect_language(name), plat_id) for plat_id, name in cursor.fetchall()]
+
+    cursor.executemany('UPDATE plats SET langue = ? WHERE id = ?', updates)
+    conn.commit()
+
+    by_language = {lang: 0 for lang in LANGUAGES}
+    for lang, _ in updates:
+        by_language[lang] += 1
+    print(f"  ✅ {len(updates)} plats étiquetés ({', '.join(f'{k}: {v}' for k, v in by_language.items())})")
+    return len(updates)
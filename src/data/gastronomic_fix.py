@@ -4,14 +4,19 @@ gastronomic_fix.py — Script de correction complète de la base de données Mic
 Applique toutes les corrections identifiées lors de l'audit.
 """
 
-import sqlite3
 import re
 import json
 import os
 from collections import defaultdict
+from datetime import date
 from typing import Dict, List, Tuple, Set
 
-DB_PATH = '/home/ff/workspace/projects/menu-analytics/menu_analytics.db'
+from db import connect, resolve_db_path, snapshot
+from dish_language import DEFAULT_LANGUAGE, tag_dish_languages
+from normalization import canonicalize, find_variant_ingredients, merge_variant_rows
+from strict_extraction_rules import ADDITIONAL_INGREDIENT_PATTERNS_EN
+
+DB_PATH = resolve_db_path('/home/ff/workspace/projects/menu-analytics/menu_analytics.db')
 OUTPUT_DIR = '/home/ff/workspace/projects/menu-analytics-dashboard/my-app/src/data'
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -19,9 +24,8 @@ OUTPUT_DIR = '/home/ff/workspace/projects/menu-analytics-dashboard/my-app/src/da
 # ═══════════════════════════════════════════════════════════════════════════════
 
 # 1. CORRECTION DES DOUBLONS ORTHOGRAPHIQUES
-ORTHOGRAPHIC_FIXES = {
-    "celeri": "céleri",  # Standardiser sur la version accentuée
-}
+# Les variantes (accents, pluriels, synonymes) sont déclarées dans
+# normalization.VARIANT_SPELLINGS et fusionnées par merge_variant_rows()
 
 # 2. NOUVELLES CATÉGORIES À CRÉER
 NEW_CATEGORIES = ["epice", "herbe", "produit_laitier", "cereale", "condiment"]
@@ -104,7 +108,6 @@ MISSING_INGREDIENTS_PATTERNS = {
     "salsifi": (r"salsifi", "legume"),
     "potimarron": (r"potimarron", "legume"),
     "patate douce": (r"patate\s+douce", "legume"),
-    "cèpe": (r"\bcèpe\b|cèpes", "champignon"),
     "chanterelle": (r"chanterelle", "champignon"),
     
     # Fruits supplémentaires
@@ -112,32 +115,29 @@ MISSING_INGREDIENTS_PATTERNS = {
     "citron vert": (r"citron\s+vert", "fruit"),
 }
 
-def get_db_connection():
-    return sqlite3.connect(DB_PATH)
+# Ingrédients détectés par le trie de normalization.py (remplacent leurs regex)
+MISSING_VARIANT_INGREDIENTS = {"cèpe"}
+
+# Tables par langue du plat (plats.langue) : un seul matcher par plat.
+# La table anglaise est restreinte aux mêmes ingrédients que la table française,
+# pour que les fréquences fr/en restent comparables.
+MISSING_INGREDIENTS_PATTERNS_BY_LANGUAGE = {
+    "fr": MISSING_INGREDIENTS_PATTERNS,
+    "en": {
+        ingredient: rule
+        for ingredient, rule in ADDITIONAL_INGREDIENT_PATTERNS_EN.items()
+        if ingredient in MISSING_INGREDIENTS_PATTERNS
+    },
+}
+
+def get_db_connection(db_path=DB_PATH, read_only=False):
+    return connect(db_path, read_only=read_only)
 
 def fix_orthographic_duplicates(conn):
-    """Corrige les doublons orthographiques (celeri → céleri)."""
-    cursor = conn.cursor()
-    
-    # Fusionne les entrées avec céleri
-    for old, new in ORTHOGRAPHIC_FIXES.items():
-        # Vérifie si les deux existent
-        cursor.execute('SELECT id FROM ingredients_clean WHERE ingredient = ?', (old,))
-        old_ids = [r[0] for r in cursor.fetchall()]
-        
-        cursor.execute('SELECT id FROM ingredients_clean WHERE ingredient = ?', (new,))
-        new_ids = [r[0] for r in cursor.fetchall()]
-        
-        if old_ids and new_ids:
-            # Supprime les anciennes entrées (la nouvelle catégorie est déjà correcte)
-            cursor.execute('DELETE FROM ingredients_clean WHERE ingredient = ?', (old,))
-            print(f"  ✅ Fusionné '{old}' → '{new}' ({len(old_ids)} entrées)")
-        elif old_ids:
-            # Renomme si seule l'ancienne existe
-            cursor.execute('UPDATE ingredients_clean SET ingredient = ? WHERE ingredient = ?', (new, old))
-            print(f"  ✅ Renommé '{old}' → '{new}' ({len(old_ids)} entrées)")
-    
-    conn.commit()
+    """Corrige les doublons orthographiques (celeri → céleri, cèpes → cèpe...)."""
+    renamed = merge_variant_rows(conn)
+    print(f"  ✅ {renamed} entrées renommées vers leur forme canonique")
+    return renamed
 
 def fix_subtypes(conn):
     """Sépare les ingrédients génériques en sous-types."""
@@ -168,25 +168,35 @@ def extract_missing_ingredients(conn):
     """Extrait les ingrédients manquants des noms de plats."""
     cursor = conn.cursor()
     
-    # Récupère les plats
-    cursor.execute('SELECT id, nom_plat FROM plats WHERE nom_plat IS NOT NULL')
+    # Étiquette la langue des plats qui n'en ont pas encore (crée la colonne si besoin)
+    tag_dish_languages(conn)
+    
+    # Récupère les plats (avec leur langue)
+    cursor.execute('SELECT id, nom_plat, langue FROM plats WHERE nom_plat IS NOT NULL')
     dishes = cursor.fetchall()
     
     # Récupère les ingrédients existants par plat (pour éviter les doublons)
     cursor.execute('SELECT plat_id, ingredient FROM ingredients_clean')
     existing_by_plat = defaultdict(set)
     for plat_id, ing in cursor.fetchall():
-        existing_by_plat[plat_id].add(ing.lower())
+        existing_by_plat[plat_id].add(canonicalize(ing).lower())
     
     new_ingredients = []
     
-    for plat_id, dish_name in dishes:
+    for plat_id, dish_name, language in dishes:
         if not dish_name:
             continue
         dish_lower = dish_name.lower()
         existing = existing_by_plat[plat_id]
         
-        for ingredient, (pattern, category) in MISSING_INGREDIENTS_PATTERNS.items():
+        # Variantes orthographiques : un seul passage du trie sur le plat
+        for ingredient, category in find_variant_ingredients(dish_lower, MISSING_VARIANT_INGREDIENTS):
+            if ingredient.lower() not in existing:
+                new_ingredients.append((plat_id, ingredient, category))
+                existing.add(ingredient.lower())
+        
+        patterns = MISSING_INGREDIENTS_PATTERNS_BY_LANGUAGE.get(language or DEFAULT_LANGUAGE, MISSING_INGREDIENTS_PATTERNS)
+        for ingredient, (pattern, category) in patterns.items():
             if ingredient.lower() in existing:
                 continue
             if re.search(pattern, dish_lower, re.IGNORECASE):
@@ -211,6 +221,26 @@ def extract_missing_ingredients(conn):
     
     return len(new_ingredients)
 
+def get_ingredient_categories(conn):
+    """
+    Retourne la catégorie unique de chaque ingrédient (celle de ingredients.json).
+
+    Un ingrédient stocké sous plusieurs catégories prend la plus fréquente
+    (égalité départagée par ordre alphabétique), pour que tous les exports
+    rangent l'ingrédient dans la même catégorie que le dashboard.
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT ingredient, categorie_ingredient, COUNT(*)
+        FROM ingredients_clean
+        GROUP BY ingredient, categorie_ingredient
+        ORDER BY ingredient, COUNT(*) DESC, categorie_ingredient
+    ''')
+    categories = {}
+    for ingredient, category, _ in cursor.fetchall():
+        categories.setdefault(ingredient, category)
+    return categories
+
 def generate_json_files(conn):
     """Régénère les fichiers JSON pour le dashboard."""
     cursor = conn.cursor()
@@ -236,11 +266,12 @@ def generate_json_files(conn):
         'category': ''
     })
     
+    categories = get_ingredient_categories(conn)
     for row in cursor.fetchall():
         ingredient, category, freq, resto_id, stars = row
         ingredient_data[ingredient]['frequency'] += freq
         ingredient_data[ingredient]['restaurants'].add(resto_id)
-        ingredient_data[ingredient]['category'] = category
+        ingredient_data[ingredient]['category'] = categories.get(ingredient, category)
         if stars:
             ingredient_data[ingredient]['by_stars'][stars] += freq
     
@@ -300,6 +331,216 @@ def generate_json_files(conn):
     
     return len(ingredients_list), len(dishes)
 
+def generate_filter_cube(conn):
+    """
+    Matérialise le cube de filtres du dashboard (ingrédient × étoile × catégorie × ville).
+
+    Un seul GROUP BY produit les cellules du cube ; les vues StarFilter × CategoryFilter
+    (y compris "all") sont ensuite agrégées en mémoire, si bien que le client n'a
+    plus qu'à lire views["<étoile>|<catégorie>"] au lieu de rescanner dishes.json.
+    La catégorie est celle de l'ingrédient dans ingredients.json (une seule par
+    ingrédient), comme pour les filtres du dashboard.
+    """
+    cursor = conn.cursor()
+
+    # Cellules du cube : une seule passe groupée sur la jointure
+    cursor.execute('''
+        SELECT
+            i.ingredient,
+            r.distinction_michelin,
+            r.ville,
+            COUNT(*) as frequency
+        FROM ingredients_clean i
+        JOIN plats p ON i.plat_id = p.id
+        JOIN restaurants r ON p.restaurant_id = r.id
+        GROUP BY i.ingredient, r.distinction_michelin, r.ville
+    ''')
+    rows = cursor.fetchall()
+    ingredient_categories = get_ingredient_categories(conn)
+
+    # Dénominateurs : nombre de plats par (étoile, ville)
+    cursor.execute('''
+        SELECT r.distinction_michelin, r.ville, COUNT(*)
+        FROM plats p
+        JOIN restaurants r ON p.restaurant_id = r.id
+        GROUP BY r.distinction_michelin, r.ville
+    ''')
+    dish_rows = cursor.fetchall()
+
+    # Dictionnaires de dimensions (les cellules stockent des indices, pas des chaînes)
+    ingredients = sorted({r[0] for r in rows})
+    stars = sorted({r[1] or '' for r in rows} | {r[0] or '' for r in dish_rows})
+    categories = sorted({ingredient_categories.get(r[0]) or '' for r in rows})
+    cities = sorted({r[2] or '' for r in rows} | {r[1] or '' for r in dish_rows})
+    ing_idx = {v: i for i, v in enumerate(ingredients)}
+    star_idx = {v: i for i, v in enumerate(stars)}
+    cat_idx = {v: i for i, v in enumerate(categories)}
+    city_idx = {v: i for i, v in enumerate(cities)}
+
+    cells = []
+    views = defaultdict(lambda: defaultdict(int))
+    for ingredient, star, city, freq in rows:
+        star = star or ''
+        category = ingredient_categories.get(ingredient) or ''
+        cells.append([ing_idx[ingredient], star_idx[star], cat_idx[category], city_idx[city or ''], freq])
+        # Rollup sur la ville, puis sur chaque dimension filtrable
+        for star_key in ('all', star):
+            for cat_key in ('all', category):
+                views[f"{star_key}|{cat_key}"][ingredient] += freq
+
+    dish_totals = []
+    dishes_by_star = defaultdict(int)
+    for star, city, count in dish_rows:
+        star = star or ''
+        dish_totals.append([star_idx[star], city_idx[city or ''], count])
+        dishes_by_star['all'] += count
+        dishes_by_star[star] += count
+
+    cube = {
+        'dimensions': {
+            'ingredients': ingredients,
+            'stars': stars,
+            'categories': categories,
+            'cities': cities,
+        },
+        'cells': cells,
+        'dish_totals': dish_totals,
+        'dishes_by_star': dict(dishes_by_star),
+        'views': {
+            key: sorted(counts.items(), key=lambda x: (-x[1], x[0]))
+            for key, counts in views.items()
+        },
+    }
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with open(os.path.join(OUTPUT_DIR, 'filter_cube.json'), 'w', encoding='utf-8') as f:
+        json.dump(cube, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"  ✅ filter_cube.json généré ({len(cells)} cellules, {len(cube['views'])} vues)")
+
+    return len(cells)
+
+def ensure_history_tables(conn):
+    """Crée les tables d'historique (snapshots incrémentaux) si nécessaire."""
+    conn.executescript('''
+        -- Rollup daté : une ligne par (ingrédient, étoile) seulement quand la valeur change.
+        -- star = 'all' porte la fréquence totale de l'ingrédient.
+        CREATE TABLE IF NOT EXISTS ingredient_history (
+            ingredient TEXT NOT NULL,
+            star TEXT NOT NULL,
+            snapshot_date TEXT NOT NULL,
+            frequency INTEGER NOT NULL,
+            PRIMARY KEY (ingredient, star, snapshot_date)
+        );
+        -- Dernière valeur connue, pour calculer le delta sans rescanner l'historique
+        CREATE TABLE IF NOT EXISTS ingredient_history_latest (
+            ingredient TEXT NOT NULL,
+            star TEXT NOT NULL,
+            frequency INTEGER NOT NULL,
+            PRIMARY KEY (ingredient, star)
+        );
+    ''')
+
+def snapshot_history(conn, snapshot_date=None):
+    """
+    Ajoute un snapshot daté des fréquences par ingrédient et par étoile.
+
+    Seules les lignes dont la valeur a changé depuis le dernier snapshot sont
+    écrites ; un ingrédient disparu est enregistré à 0.
+
+    Returns:
+        ensemble des ingrédients modifiés
+    """
+    if snapshot_date is None:
+        snapshot_date = date.today().isoformat()
+
+    ensure_history_tables(conn)
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        SELECT i.ingredient, r.distinction_michelin, COUNT(*)
+        FROM ingredients_clean i
+        JOIN plats p ON i.plat_id = p.id
+        JOIN restaurants r ON p.restaurant_id = r.id
+        GROUP BY i.ingredient, r.distinction_michelin
+    ''')
+    current = defaultdict(int)
+    for ingredient, stars, freq in cursor.fetchall():
+        current[(ingredient, 'all')] += freq
+        if stars:
+            current[(ingredient, stars)] += freq
+
+    cursor.execute('SELECT ingredient, star, frequency FROM ingredient_history_latest')
+    latest = {(ing, star): freq for ing, star, freq in cursor.fetchall()}
+
+    changes = []
+    for key in current.keys() | latest.keys():
+        freq = current.get(key, 0)
+        if latest.get(key) != freq:
+            changes.append((key[0], key[1], freq))
+
+    cursor.executemany(
+        'INSERT OR REPLACE INTO ingredient_history (ingredient, star, snapshot_date, frequency) VALUES (?, ?, ?, ?)',
+        [(ing, star, snapshot_date, freq) for ing, star, freq in changes]
+    )
+    cursor.executemany(
+        'INSERT OR REPLACE INTO ingredient_history_latest (ingredient, star, frequency) VALUES (?, ?, ?)',
+        changes
+    )
+    conn.commit()
+
+    changed = {ing for ing, _, _ in changes}
+    print(f"  ✅ Snapshot {snapshot_date}: {len(changes)} lignes modifiées ({len(changed)} ingrédients)")
+    return changed
+
+def generate_trend_files(conn, ingredients=None):
+    """
+    Exporte une série temporelle compacte par ingrédient (trends/<id>.json).
+
+    Les points sont ceux de l'historique (valeurs aux dates de changement), au
+    format DailyDataPoint. Si `ingredients` est fourni, seuls ces fichiers sont
+    régénérés.
+    """
+    cursor = conn.cursor()
+    query = '''
+        SELECT ingredient, star, snapshot_date, frequency
+        FROM ingredient_history
+        {where}
+        ORDER BY ingredient, star, snapshot_date
+    '''
+    if ingredients is None:
+        cursor.execute(query.format(where=''))
+        rows = cursor.fetchall()
+    else:
+        # Lecture par la clé primaire : pas de rescan de tout l'historique
+        rows = []
+        for ingredient in sorted(ingredients):
+            cursor.execute(query.format(where='WHERE ingredient = ?'), (ingredient,))
+            rows.extend(cursor.fetchall())
+
+    series = defaultdict(lambda: {'frequency': [], 'by_stars': defaultdict(list)})
+    for ingredient, star, snapshot_date, freq in rows:
+        point = {'date': snapshot_date, 'value': freq}
+        if star == 'all':
+            series[ingredient]['frequency'].append(point)
+        else:
+            series[ingredient]['by_stars'][star].append(point)
+
+    trends_dir = os.path.join(OUTPUT_DIR, 'trends')
+    os.makedirs(trends_dir, exist_ok=True)
+    for ingredient, data in series.items():
+        path = os.path.join(trends_dir, f"{ingredient.replace(' ', '-')}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'id': ingredient.replace(' ', '-'),
+                'name': ingredient,
+                'frequency': data['frequency'],
+                'by_stars': dict(data['by_stars']),
+            }, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"  ✅ {len(series)} fichiers de tendance générés dans trends/")
+    return len(series)
+
 def print_stats(conn):
     """Affiche les statistiques finales."""
     cursor = conn.cursor()
@@ -338,12 +579,12 @@ def print_stats(conn):
     for row in cursor.fetchall():
         print(f"    • {row[0]}: {row[1]}")
 
-def main():
+def main(db_path=DB_PATH):
     print("="*80)
     print("CORRECTION GASTRONOMIQUE COMPLÈTE")
     print("="*80)
     
-    conn = get_db_connection()
+    conn = get_db_connection(db_path)
     
     # 1. Corrige les doublons orthographiques
     print("\n1. Correction des doublons orthographiques...")
@@ -359,11 +600,28 @@ def main():
     
     # 4. Génère les JSON
     print("\n4. Génération des fichiers JSON...")
-    ing_count, dish_count = generate_json_files(conn)
-    
-    # 5. Stats finales
-    print_stats(conn)
-    
+    # Connexion lecture seule + instantané (WAL) : les exports ne bloquent pas l'ingestion
+    read_conn = get_db_connection(db_path, read_only=True)
+    with snapshot(read_conn):
+        ing_count, dish_count = generate_json_files(read_conn)
+        cube_cells = generate_filter_cube(read_conn)
+        # Matrice CSR optionnelle : NumPy n'est requis que pour cet export
+        try:
+            from sparse_export import export_incidence_matrix
+        except ImportError:
+            print("  ⚠️  NumPy absent : export de la matrice CSR ignoré")
+        else:
+            export_incidence_matrix(read_conn, OUTPUT_DIR)
+    
+    # 5. Historique incrémental + séries temporelles
+    print("\n5. Snapshot de l'historique...")
+    changed = snapshot_history(conn)
+    generate_trend_files(conn, changed)
+    
+    # 6. Stats finales
+    print_stats(read_conn)
+    
+    read_conn.close()
     conn.close()
     
     print("\n" + "="*80)
@@ -374,7 +632,9 @@ def main():
         'subtypes_fixed': subtype_count,
         'missing_extracted': missing_count,
         'total_ingredients': ing_count,
-        'total_dishes': dish_count
+        'total_dishes': dish_count,
+        'cube_cells': cube_cells,
+        'history_changed': len(changed)
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+normalization.py — Canonicalisation des variantes orthographiques d'ingrédients.
+
+Ce fichier définit:
+1. VARIANT_SPELLINGS: pour chaque ingrédient canonique, sa catégorie et ses variantes
+   (accents, tirets, synonymes) ; les pluriels en -s sont ajoutés automatiquement.
+   Catégorie None = renommage seulement (l'ingrédient n'est pas détecté dans les plats)
+2. VariantTrie: trie de préfixes qui repère toutes les variantes d'un nom de plat en
+   un seul passage, quel que soit le nombre de variantes
+3. merge_variant_rows(): fusionne en base les lignes écrites sous une variante
+   (un seul UPDATE groupé, puis suppression des doublons par plat)
+
+Usage:
+  - Import: from normalization import canonicalize, find_variant_ingredients
+"""
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# VARIANTES — { ingrédient_canonique: (catégorie | None, [variantes]) }
+# La forme canonique est toujours reconnue ; les pluriels en -s sont implicites.
+# Seules les entrées avec une catégorie alimentent la détection dans les noms de
+# plats (elles remplacent des regex existantes) ; les autres servent au renommage.
+# ═══════════════════════════════════════════════════════════════════════════════
+
+VARIANT_SPELLINGS: dict[str, tuple[str | None, list[str]]] = {
+    "céleri":    (None,         ["celeri"]),
+    "cèpe":      ("champignon", ["cepe"]),
+    "shii-take": ("champignon", ["shiitake", "shii take"]),
+}
+
+
+def _word_char(c: str) -> bool:
+    return c.isalnum() or c == '_'
+
+
+def _plural(variant: str) -> str | None:
+    """Pluriel régulier en -s (None si la variante est déjà au pluriel)."""
+    if variant.endswith(('s', 'x', 'z')):
+        return None
+    return variant + 's'
+
+
+class VariantTrie:
+    """Trie de préfixes : variante (minuscules) → ingrédient canonique."""
+
+    _END = ''
+
+    def __init__(self):
+        self.root: dict = {}
+
+    def insert(self, variant: str, canonical: str) -> None:
+        node = self.root
+        for c in variant.lower():
+            node = node.setdefault(c, {})
+        node[self._END] = canonical
+
+    def match_at(self, text: str, start: int) -> tuple[int, str] | None:
+        """Plus longue variante commençant à `start` et finissant sur une frontière de mot."""
+        node = self.root
+        best = None
+        i = start
+        while i < len(text) and text[i] in node:
+            node = node[text[i]]
+            i += 1
+            if self._END in node and (i == len(text) or not _word_char(text[i])):
+                best = (i, node[self._END])
+        return best
+
+    def scan(self, text: str) -> list[tuple[int, int, str]]:
+        """
+        Repère toutes les variantes d'un texte (déjà en minuscules), de gauche à droite.
+
+        Returns:
+            Liste de tuples (début, fin, ingrédient canonique)
+        """
+        found = []
+        i = 0
+        n = len(text)
+        while i < n:
+            # Une variante commence forcément en début de mot
+            if i > 0 and _word_char(text[i - 1]):
+                i += 1
+                continue
+            match = self.match_at(text, i)
+            if match:
+                end, canonical = match
+                found.append((i, end, canonical))
+                i = end
+            else:
+                i += 1
+        return found
+
+
+def build_trie(variants: dict[str, tuple[str | None, list[str]]] = VARIANT_SPELLINGS) -> VariantTrie:
+    """Construit le trie de détection (entrées avec une catégorie seulement)."""
+    trie = VariantTrie()
+    for canonical, (category, spellings) in variants.items():
+        if category is None:
+            continue
+        for spelling in [canonical, *spellings]:
+            trie.insert(spelling, canonical)
+            plural = _plural(spelling)
+            if plural:
+                trie.insert(plural, canonical)
+    return trie
+
+
+VARIANT_TRIE = build_trie()
+
+
+def build_variant_map(variants: dict[str, tuple[str | None, list[str]]] = VARIANT_SPELLINGS) -> dict[str, str]:
+    """Variante → canonique (pour renommer des noms d'ingrédients exacts)."""
+    mapping = {}
+    for canonical, (_, spellings) in variants.items():
+        for spelling in [canonical, *spellings]:
+            plural = _plural(spelling)
+            for form in (spelling, plural):
+                if form and form != canonical:
+                    mapping[form] = canonical
+    return mapping
+
+
+VARIANT_TO_CANONICAL = build_variant_map()
+
+
+def canonicalize(ingredient: str) -> str:
+    """Retourne le nom canonique d'un ingrédient (inchangé s'il n'est pas une variante)."""
+    return VARIANT_TO_CANONICAL.get(ingredient.lower(), ingredient)
+
+
+def find_variant_ingredients(dish_name: str, ingredients: set[str] = None) -> list[tuple[str, str]]:
+    """
+    Extrait les ingrédients canoniques présents dans un nom de plat (un seul passage).
+
+    Args:
+        dish_name: Nom du plat à analyser
+        ingredients: si fourni, ne retient que ces ingrédients canoniques
+
+    Returns:
+        Liste de tuples (ingredient, categorie), sans doublons, dans l'ordre du plat
+    """
+    found = []
+    seen = set()
+    for _, _, canonical in VARIANT_TRIE.scan(dish_name.lower()):
+        if ingredients is not None and canonical not in ingredients:
+            continue
+        if canonical not in seen:
+            seen.add(canonical)
+            found.append((canonical, VARIANT_SPELLINGS[canonical][0]))
+    return found
+
+
+def merge_variant_rows(conn) -> int:
+    """
+    Renomme les lignes de ingredients_clean écrites sous une variante.
+
+    Un seul UPDATE groupé (via une table temporaire de correspondance), puis
+    suppression des doublons (plat_id, ingredient) créés par ce renommage ; les
+    doublons qui existaient déjà avant ne sont pas touchés. La catégorie devient
+    celle du canonique : celle de VARIANT_SPELLINGS, ou pour les entrées de
+    renommage seul, la plus fréquente parmi les lignes canoniques existantes.
+
+    Returns:
+        nombre de lignes renommées
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS variant_map (
+            variant TEXT PRIMARY KEY, canonical TEXT NOT NULL, category TEXT
+        )
+    ''')
+    cursor.execute('DELETE FROM variant_map')
+    cursor.executemany(
+        'INSERT INTO variant_map (variant, canonical, category) VALUES (?, ?, ?)',
+        [(variant, canonical, VARIANT_SPELLINGS[canonical][0]) for variant, canonical in VARIANT_TO_CANONICAL.items()]
+    )
+    # Renommage seul : catégorie majoritaire des lignes déjà écrites sous le canonique
+    cursor.execute('''
+        UPDATE variant_map
+        SET category = (
+            SELECT categorie_ingredient FROM ingredients_clean
+            WHERE ingredient = variant_map.canonical
+            GROUP BY categorie_ingredient
+            ORDER BY COUNT(*) DESC, categorie_ingredient
+            LIMIT 1
+        )
+        WHERE category IS NULL
+    ''')
+
+    # Lignes concernées, mémorisées avant le renommage
+    cursor.execute('CREATE TEMP TABLE IF NOT EXISTS renamed_ids (id INTEGER PRIMARY KEY)')
+    cursor.execute('DELETE FROM renamed_ids')
+    cursor.execute('''
+        INSERT INTO renamed_ids (id)
+        SELECT id FROM ingredients_clean WHERE ingredient IN (SELECT variant FROM variant_map)
+    ''')
+    renamed = cursor.rowcount
+
+    if renamed:
+        cursor.execute('''
+            UPDATE ingredients_clean
+            SET (ingredient, categorie_ingredient) = (
+                SELECT canonical, COALESCE(category, ingredients_clean.categorie_ingredient)
+                FROM variant_map WHERE variant = ingredients_clean.ingredient
+            )
+            WHERE id IN (SELECT id FROM renamed_ids)
+        ''')
+        # Une ligne renommée est un doublon si le plat avait déjà la forme canonique,
+        # ou si une autre ligne renommée (plus ancienne) y a abouti
+        cursor.execute('''
+            DELETE FROM ingredients_clean
+            WHERE id IN (SELECT id FROM renamed_ids)
+              AND EXISTS (
+                  SELECT 1 FROM ingredients_clean other
+                  WHERE other.plat_id = ingredients_clean.plat_id
+                    AND other.ingredient = ingredients_clean.ingredient
+                    AND (other.id NOT IN (SELECT id FROM renamed_ids) OR other.id < ingredients_clean.id)
+              )
+        ''')
+
+    cursor.execute('DROP TABLE variant_map')
+    cursor.execute('DROP TABLE renamed_ids')
+    conn.commit()
+    return renamed
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+query_service.py — Service HTTP local de requêtes sur menu_analytics.db.
+
+Ce fichier définit:
+1. QueryService: requêtes paginées (ingrédients, plats, associations) sur une
+   connexion lecture seule (cf. db.py), avec un cache LRU des résultats
+2. LRUCache: cache borné, vidé dès que PRAGMA data_version signale un commit
+   d'un autre processus (ingestion, gastronomic_fix...)
+3. serve(): serveur HTTP (bibliothèque standard) qui expose les endpoints JSON
+
+Endpoints (GET, paramètres limit/offset sur tous):
+  /ingredients ?category=&star=&city=
+  /dishes      ?ingredient=&star=&city=
+  /pairings    ?ingredient=  (obligatoire)
+
+Usage:
+  - CLI: python3 query_service.py [db_path] [port]
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from db import connect, resolve_db_path
+
+DEFAULT_PORT = 8765
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+CACHE_SIZE = 1024
+
+
+class LRUCache:
+    """Cache LRU borné (clé → résultat JSON-sérialisable)."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key):
+        if key not in self._data:
+            return None
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key, value) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class QueryError(ValueError):
+    """Paramètre de requête invalide (→ HTTP 400)."""
+
+
+def _filters(params: dict, columns: dict[str, str]) -> tuple[str, list]:
+    """Construit la clause WHERE à partir des paramètres présents."""
+    clauses = []
+    values = []
+    for param, column in columns.items():
+        if params.get(param):
+            clauses.append(f'{column} = ?')
+            values.append(params[param])
+    return ('WHERE ' + ' AND '.join(clauses)) if clauses else '', values
+
+
+def _pagination(params: dict) -> tuple[int, int]:
+    try:
+        limit = int(params.get('limit', DEFAULT_LIMIT))
+        offset = int(params.get('offset', 0))
+    except ValueError:
+        raise QueryError("limit et offset doivent être des entiers")
+    if limit < 1 or offset < 0:
+        raise QueryError("limit doit être >= 1 et offset >= 0")
+    return min(limit, MAX_LIMIT), offset
+
+
+class QueryService:
+    """Requêtes paginées et mises en cache sur la base (connexion lecture seule partagée)."""
+
+    def __init__(self, db_path: str, cache_size: int = CACHE_SIZE):
+        self.conn = connect(db_path, read_only=True, check_same_thread=False)
+        self.cache = LRUCache(cache_size)
+        self._lock = threading.Lock()
+        self._data_version = None
+        self.routes = {
+            '/ingredients': self.ingredients,
+            '/dishes': self.dishes,
+            '/pairings': self.pairings,
+        }
+
+    def query(self, path: str, params: dict) -> dict:
+        """
+        Répond à une requête (path, paramètres), depuis le cache si la base n'a pas changé.
+
+        Raises:
+            QueryError: paramètres invalides
+        """
+        handler = self.routes[path]
+        key = (path, tuple(sorted(params.items())))
+        with self._lock:
+            version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+            if version != self._data_version:
+                self.cache.clear()
+                self._data_version = version
+            result = self.cache.get(key)
+            if result is None:
+                result = handler(params)
+                self.cache.put(key, result)
+        return result
+
+    def _page(self, sql: str, values: list, params: dict, columns: tuple[str, ...], order_by: str) -> dict:
+        """
+        Exécute `sql` paginé. Le tri (`order_by`, sur les colonnes de `sql`) est appliqué
+        dans la requête externe : l'ordre d'une sous-requête n'est pas garanti.
+        """
+        limit, offset = _pagination(params)
+        rows = self.conn.execute(
+            f'SELECT *, COUNT(*) OVER () FROM ({sql}) ORDER BY {order_by} LIMIT ? OFFSET ?',
+            [*values, limit, offset]
+        ).fetchall()
+        if rows:
+            total = rows[0][-1]
+        else:
+            total = self.conn.execute(f'SELECT COUNT(*) FROM ({sql})', values).fetchone()[0]
+        return {
+            'items': [dict(zip(columns, row[:-1])) for row in rows],
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+        }
+
+    def ingredients(self, params: dict) -> dict:
+        """Stats par ingrédient (fréquence, restaurants), filtrables par catégorie/étoile/ville."""
+        where, values = _filters(params, {
+            'category': 'i.categorie_ingredient',
+            'star': 'r.distinction_michelin',
+            'city': 'r.ville',
+        })
+        sql = f'''
+            SELECT
+                i.ingredient,
+                MAX(i.categorie_ingredient) as category,
+                COUNT(*) as frequency,
+                COUNT(DISTINCT r.id) as restaurants
+            FROM ingredients_clean i
+            JOIN plats p ON i.plat_id = p.id
+            JOIN restaurants r ON p.restaurant_id = r.id
+            {where}
+            GROUP BY i.ingredient
+        '''
+        return self._page(sql, values, params, ('name', 'category', 'frequency', 'restaurants'),
+                          order_by='frequency DESC, ingredient')
+
+    def dishes(self, params: dict) -> dict:
+        """Plats filtrables par ingrédient/étoile/ville."""
+        where, values = _filters(params, {
+            'star': 'r.distinction_michelin',
+            'city': 'r.ville',
+        })
+        if params.get('ingredient'):
+            where = (where + ' AND ' if where else 'WHERE ') + \
+                'p.id IN (SELECT plat_id FROM ingredients_clean WHERE ingredient = ?)'
+            values.append(params['ingredient'])
+        sql = f'''
+            SELECT p.id, p.nom_plat, p.category, r.distinction_michelin, r.ville
+            FROM plats p
+            JOIN restaurants r ON p.restaurant_id = r.id
+            {where}
+        '''
+        return self._page(sql, values, params, ('id', 'name', 'category', 'stars', 'city'),
+                          order_by='id')
+
+    def pairings(self, params: dict) -> dict:
+        """Ingrédients les plus souvent associés à `ingredient` dans un même plat."""
+        if not params.get('ingredient'):
+            raise QueryError("paramètre 'ingredient' obligatoire")
+        sql = '''
+            SELECT b.ingredient, COUNT(DISTINCT b.plat_id) as dishes
+            FROM ingredients_clean a
+            JOIN ingredients_clean b ON a.plat_id = b.plat_id AND b.ingredient != a.ingredient
+            WHERE a.ingredient = ?
+            GROUP BY b.ingredient
+        '''
+        return self._page(sql, [params['ingredient']], params, ('name', 'dishes'),
+                          order_by='dishes DESC, ingredient')
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def make_handler(service: QueryService):
+    """Crée la classe de handler HTTP liée au service."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            path = url.path.rstrip('/') or '/'
+            if path not in service.routes:
+                self._send(404, {'error': f"endpoint inconnu: {url.path}"})
+                return
+            try:
+                self._send(200, service.query(path, params))
+            except QueryError as e:
+                self._send(400, {'error': str(e)})
+            except sqlite3.Error as e:
+                self._send(500, {'error': f"erreur base de données: {e}"})
+
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(db_path: str, port: int = DEFAULT_PORT):
+    """Lance le service sur localhost:port jusqu'à Ctrl+C."""
+    service = QueryService(db_path)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(service))
+    print(f"✅ Service de requêtes sur http://127.0.0.1:{port} ({db_path})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else resolve_db_path(os.path.join(os.path.dirname(__file__), 'menu_analytics.db'))
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT
+    serve(db_path, port)
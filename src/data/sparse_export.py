@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+sparse_export.py — Matrice d'incidence plat × ingrédient au format CSR (NumPy).
+
+Ce fichier définit:
+1. export_incidence_matrix(): écrit la matrice CSR (indptr, indices) et les codes
+   par plat (étoile, ville, restaurant) en fichiers .npy, plus un vocabulaire JSON
+2. load_incidence_matrix(): recharge les tableaux en mmap_mode='r' (pas de copie)
+3. frequency_by_star() / ingredient_share_by_city(): agrégations vectorisées
+
+Usage:
+  - Import: from sparse_export import load_incidence_matrix, frequency_by_star
+  - CLI:     python3 sparse_export.py [db_path] [output_dir]
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+
+from db import connect, resolve_db_path, snapshot
+
+MATRIX_DIRNAME = 'matrix'
+ARRAY_NAMES = ('indptr', 'indices', 'dish_ids', 'dish_star', 'dish_city', 'dish_restaurant')
+
+
+def _encode(values: list) -> tuple[list, np.ndarray]:
+    """Encode une liste de valeurs en (vocabulaire trié, codes int32)."""
+    vocab = sorted(set(values))
+    index = {v: i for i, v in enumerate(vocab)}
+    return vocab, np.fromiter((index[v] for v in values), dtype=np.int32, count=len(values))
+
+
+def export_incidence_matrix(conn, output_dir: str) -> tuple[int, int]:
+    """
+    Exporte la matrice d'incidence plat × ingrédient dans output_dir/matrix/.
+
+    Ligne i = plat dish_ids[i] ; ses ingrédients sont indices[indptr[i]:indptr[i+1]].
+    Un ingrédient présent plusieurs fois dans un plat n'est compté qu'une fois.
+
+    Returns:
+        (nombre de plats, nombre d'entrées non nulles)
+    """
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        SELECT p.id, r.id, r.distinction_michelin, r.ville
+        FROM plats p
+        JOIN restaurants r ON p.restaurant_id = r.id
+        ORDER BY p.id
+    ''')
+    dishes = cursor.fetchall()
+    row_of = {dish_id: i for i, (dish_id, _, _, _) in enumerate(dishes)}
+
+    cursor.execute('''
+        SELECT DISTINCT plat_id, ingredient
+        FROM ingredients_clean
+        ORDER BY plat_id, ingredient
+    ''')
+    pairs = [(plat_id, ing) for plat_id, ing in cursor.fetchall() if plat_id in row_of]
+
+    ingredients, indices = _encode([ing for _, ing in pairs])
+    rows = np.fromiter((row_of[plat_id] for plat_id, _ in pairs), dtype=np.int64, count=len(pairs))
+    indptr = np.zeros(len(dishes) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(dishes)), out=indptr[1:])
+
+    stars, dish_star = _encode([d[2] or '' for d in dishes])
+    cities, dish_city = _encode([d[3] or '' for d in dishes])
+    restaurants, dish_restaurant = _encode([d[1] for d in dishes])
+
+    arrays = {
+        'indptr': indptr,
+        'indices': indices,
+        'dish_ids': np.array([d[0] for d in dishes], dtype=np.int64),
+        'dish_star': dish_star,
+        'dish_city': dish_city,
+        'dish_restaurant': dish_restaurant,
+    }
+
+    matrix_dir = os.path.join(output_dir, MATRIX_DIRNAME)
+    os.makedirs(matrix_dir, exist_ok=True)
+    for name in ARRAY_NAMES:
+        np.save(os.path.join(matrix_dir, f'{name}.npy'), arrays[name])
+
+    with open(os.path.join(matrix_dir, 'vocab.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'ingredients': ingredients,
+            'stars': stars,
+            'cities': cities,
+            'restaurants': restaurants,
+        }, f, ensure_ascii=False, indent=2)
+
+    print(f"  ✅ matrice CSR exportée ({len(dishes)} plats × {len(ingredients)} ingrédients, {len(indices)} entrées)")
+    return len(dishes), len(indices)
+
+
+def load_incidence_matrix(output_dir: str) -> dict:
+    """
+    Recharge la matrice exportée, tableaux ouverts en mmap_mode='r'.
+
+    Returns:
+        dict avec les tableaux de ARRAY_NAMES et 'vocab' (listes de libellés)
+    """
+    matrix_dir = os.path.join(output_dir, MATRIX_DIRNAME)
+    matrix = {
+        name: np.load(os.path.join(matrix_dir, f'{name}.npy'), mmap_mode='r')
+        for name in ARRAY_NAMES
+    }
+    with open(os.path.join(matrix_dir, 'vocab.json'), encoding='utf-8') as f:
+        matrix['vocab'] = json.load(f)
+    return matrix
+
+
+def _entry_codes(matrix: dict, dish_codes: np.ndarray) -> np.ndarray:
+    """Propage un code par plat sur chaque entrée non nulle de la matrice."""
+    return np.repeat(dish_codes, np.diff(matrix['indptr']))
+
+
+def frequency_by_star(matrix: dict) -> np.ndarray:
+    """Nombre de plats par (ingrédient, étoile) — tableau (n_ingrédients, n_étoiles)."""
+    n_ing = len(matrix['vocab']['ingredients'])
+    n_star = len(matrix['vocab']['stars'])
+    stars = _entry_codes(matrix, matrix['dish_star'])
+    counts = np.bincount(matrix['indices'] * n_star + stars, minlength=n_ing * n_star)
+    return counts.reshape(n_ing, n_star)
+
+
+def ingredient_share_by_city(matrix: dict) -> np.ndarray:
+    """Part des plats de chaque ville contenant l'ingrédient — (n_ingrédients, n_villes)."""
+    n_ing = len(matrix['vocab']['ingredients'])
+    n_city = len(matrix['vocab']['cities'])
+    cities = _entry_codes(matrix, matrix['dish_city'])
+    counts = np.bincount(matrix['indices'] * n_city + cities, minlength=n_ing * n_city)
+    dishes_per_city = np.bincount(matrix['dish_city'], minlength=n_city)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = counts.reshape(n_ing, n_city) / dishes_per_city
+    return np.nan_to_num(share)
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else resolve_db_path(os.path.join(os.path.dirname(__file__), 'menu_analytics.db'))
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.dirname(os.path.abspath(__file__))
+    conn = connect(db_path, read_only=True)
+    with snapshot(conn):
+        export_incidence_matrix(conn, output_dir)
+    conn.close()
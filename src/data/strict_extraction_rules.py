@@ -11,13 +11,18 @@ Usage:
   - Import: from strict_extraction_rules import validate_ingredient, EXCLUSION_RULES
   - CLI:     python3 strict_extraction_rules.py          # audit seul (dry run)
   - CLI:     python3 strict_extraction_rules.py --apply   # applique les corrections
+  - La base peut être choisie via la variable MENU_ANALYTICS_DB ; l'audit l'ouvre
+    en lecture seule (cf. db.py) et peut tourner pendant l'ingestion.
 """
 
-import sqlite3
 import re
 import sys
 import os
 
+from db import connect, resolve_db_path, snapshot
+from dish_language import detect_language
+from normalization import find_variant_ingredients
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # RÈGLES D'EXCLUSION — Un ingrédient est un FAUX POSITIF si le nom du plat
 # matche l'un des patterns d'exclusion listés.
@@ -235,18 +240,20 @@ def validate_ingredient(ingredient: str, dish_name: str) -> bool:
 
 
 def audit_database(db_path: str) -> list[dict]:
-    """Audite la base et retourne la liste des faux positifs."""
-    conn = sqlite3.connect(db_path)
+    """Audite la base (en lecture seule) et retourne la liste des faux positifs."""
+    conn = connect(db_path, read_only=True)
     cursor = conn.cursor()
     
-    cursor.execute('''
-        SELECT i.id, i.ingredient, i.categorie_ingredient, p.nom_plat, p.id
-        FROM ingredients_clean i
-        JOIN plats p ON i.plat_id = p.id
-    ''')
+    with snapshot(conn):
+        cursor.execute('''
+            SELECT i.id, i.ingredient, i.categorie_ingredient, p.nom_plat, p.id
+            FROM ingredients_clean i
+            JOIN plats p ON i.plat_id = p.id
+        ''')
+        rows = cursor.fetchall()
     
     false_positives = []
-    for row in cursor.fetchall():
+    for row in rows:
         ing_id, ingredient, category, dish_name, plat_id = row
         if not validate_ingredient(ingredient, dish_name):
             false_positives.append({
@@ -292,7 +299,7 @@ def clean_database(db_path: str, dry_run: bool = True) -> int:
             print(f"   ... et {len(items) - 5} autres")
     
     if not dry_run and false_positives:
-        conn = sqlite3.connect(db_path)
+        conn = connect(db_path)
         cursor = conn.cursor()
         ids_to_delete = [fp['ing_id'] for fp in false_positives]
         cursor.executemany(
@@ -385,9 +392,8 @@ ADDITIONAL_INGREDIENT_PATTERNS: dict[str, tuple[str, str]] = {
     "sirop": (r"\bsirop\b", "condiment"),
     
     # Champignons spécifiques
-    "cèpe": (r"\bcèpe\b|cèpes", "champignon"),
+    # (cèpe, shii-take: variantes gérées par normalization.VARIANT_SPELLINGS)
     "chanterelle": (r"chanterelle", "champignon"),
-    "shii-take": (r"shii[-]?take|shiitake", "champignon"),
     
     # Légumes additionnels
     "butternut": (r"butternut", "legume"),
@@ -405,24 +411,124 @@ ADDITIONAL_INGREDIENT_PATTERNS: dict[str, tuple[str, str]] = {
 }
 
 
-def extract_additional_ingredients(dish_name: str, existing_ingredients: set[str] = None) -> list[tuple[str, str]]:
+# Équivalents anglais : mêmes noms canoniques (français) et catégories
+ADDITIONAL_INGREDIENT_PATTERNS_EN: dict[str, tuple[str, str]] = {
+    # Épices et aromates
+    "vanille": (r"vanilla", "epice"),
+    "safran": (r"saffron", "epice"),
+    # bell/sweet/red/green pepper = poivron, pas poivre
+    "poivre": (r"(?<!bell )(?<!sweet )(?<!red )(?<!green )\bpepper(?:corns?)?\b", "epice"),
+    "poivre de sichuan": (r"sichuan", "epice"),
+    "curcuma": (r"turmeric", "epice"),
+    "gingembre": (r"ginger", "epice"),
+    "cardamome": (r"cardamom", "epice"),
+    "cannelle": (r"cinnamon", "epice"),
+    "muscade": (r"nutmeg", "epice"),
+    "piment": (r"\bchill?i(?:es)?\b", "epice"),
+    "paprika": (r"paprika", "epice"),
+    "anis": (r"(?<!star )\banise\b", "epice"),
+    "badiane": (r"star\s+anise", "epice"),
+    "miso": (r"miso", "epice"),
+    "wasabi": (r"wasabi", "epice"),
+    "yuzu kosho": (r"yuzu\s+kosho", "epice"),
+    "fleur de sel": (r"fleur\s+de\s+sel", "epice"),
+
+    # Herbes
+    "basilic": (r"basil\b", "herbe"),
+    "thym": (r"\bthyme\b", "herbe"),
+    "romarin": (r"rosemary", "herbe"),
+    "estragon": (r"tarragon", "herbe"),
+    "ciboulette": (r"\bchives?\b", "herbe"),
+    "persil": (r"parsley", "herbe"),
+    "coriandre": (r"coriander|cilantro", "herbe"),
+    "cerfeuil": (r"chervil", "herbe"),
+    "livèche": (r"lovage", "herbe"),
+    "menthe": (r"\bmint\b", "herbe"),
+    "laurier": (r"bay\s+lea(?:f|ves)", "herbe"),
+    "citronnelle": (r"lemongrass|lemon\s+grass", "herbe"),
+
+    # Produits laitiers
+    "beurre": (r"(?<!brown )\bbutter\b", "produit_laitier"),
+    "beurre salé": (r"salted\s+butter", "produit_laitier"),
+    "crème": (r"\bcream\b", "produit_laitier"),
+    "fromage": (r"\bcheese\b", "produit_laitier"),
+    "comté": (r"comt[ée]", "produit_laitier"),
+    "parmesan": (r"parmesan", "produit_laitier"),
+    "reblochon": (r"reblochon", "produit_laitier"),
+    "yaourt": (r"yog(?:h)?urt", "produit_laitier"),
+    "lait": (r"\bmilk\b", "produit_laitier"),
+
+    # Céréales/Féculents
+    "riz": (r"\brice\b", "cereale"),
+    "blé": (r"\bwheat\b", "cereale"),
+    "quinoa": (r"quinoa", "cereale"),
+    "sarrasin": (r"buckwheat", "cereale"),
+    "gnocchi": (r"gnocchi", "cereale"),
+    "polenta": (r"polenta", "cereale"),
+    "pain": (r"\bbread\b", "cereale"),
+    "brioche": (r"brioche", "cereale"),
+    "biscuit": (r"biscuit", "cereale"),
+
+    # Condiments
+    "huile d'olive": (r"olive\s+oil", "condiment"),
+    "vinaigre": (r"vinegar", "condiment"),
+    "vinaigrette": (r"vinaigrette", "condiment"),
+    "moutarde": (r"mustard", "condiment"),
+    "mayonnaise": (r"mayonnaise", "condiment"),
+    "sauce soja": (r"soy\s+sauce", "condiment"),
+    "miel": (r"\bhoney\b", "condiment"),
+    "sirop": (r"\bsyrup\b", "condiment"),
+
+    # Champignons spécifiques
+    "chanterelle": (r"chanterelle", "champignon"),
+
+    # Légumes additionnels
+    "butternut": (r"butternut", "legume"),
+    "salsifi": (r"salsify", "legume"),
+    "potimarron": (r"red\s+kuri", "legume"),
+    "patate douce": (r"sweet\s+potato", "legume"),
+
+    # Fruits additionnels
+    "bergamote": (r"bergamot", "fruit"),
+    "citron vert": (r"(?<!kaffir )(?<!makrut )\blimes?\b", "fruit"),   # canonique des données (FR: citron vert)
+    "combava": (r"kaffir\s+lime|makrut", "fruit"),
+    "sudachi": (r"sudachi", "fruit"),
+}
+
+# Tables de détection par langue (cf. dish_language.detect_language)
+ADDITIONAL_INGREDIENT_PATTERNS_BY_LANGUAGE: dict[str, dict[str, tuple[str, str]]] = {
+    "fr": ADDITIONAL_INGREDIENT_PATTERNS,
+    "en": ADDITIONAL_INGREDIENT_PATTERNS_EN,
+}
+
+
+def extract_additional_ingredients(dish_name: str, existing_ingredients: set[str] = None,
+                                   language: str = None) -> list[tuple[str, str]]:
     """
     Extrait les ingrédients additionnels d'un nom de plat.
     
     Args:
         dish_name: Nom du plat à analyser
         existing_ingredients: Set d'ingrédients déjà extraits (pour éviter les doublons)
+        language: 'fr' ou 'en' (étiquette plats.langue) ; détectée si absente
     
     Returns:
         Liste de tuples (ingredient, categorie)
     """
     if existing_ingredients is None:
         existing_ingredients = set()
+    if language is None:
+        language = detect_language(dish_name)
+    patterns = ADDITIONAL_INGREDIENT_PATTERNS_BY_LANGUAGE.get(language, ADDITIONAL_INGREDIENT_PATTERNS)
     
     dish_lower = dish_name.lower()
-    found = []
+    found = [
+        (ingredient, category)
+        for ingredient, category in find_variant_ingredients(dish_lower)
+        if ingredient.lower() not in existing_ingredients
+    ]
     
-    for ingredient, (pattern, category) in ADDITIONAL_INGREDIENT_PATTERNS.items():
+    for ingredient, (pattern, category) in patterns.items():
         if ingredient.lower() in existing_ingredients:
             continue
         if re.search(pattern, dish_lower, re.IGNORECASE):
@@ -432,6 +538,6 @@ def extract_additional_ingredients(dish_name: str, existing_ingredients: set[str
 
 
 if __name__ == "__main__":
-    db_path = os.path.join(os.path.dirname(__file__), 'menu_analytics.db')
+    db_path = resolve_db_path(os.path.join(os.path.dirname(__file__), 'menu_analytics.db'))
     apply_mode = "--apply" in sys.argv
     clean_database(db_path, dry_run=not apply_mode)
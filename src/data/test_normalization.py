@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+test_normalization.py — Vérifications du trie de variantes et de la fusion en base.
+
+Usage:
+  - CLI: python3 -m pytest test_normalization.py   (ou python3 test_normalization.py)
+"""
+
+import sqlite3
+import unittest
+
+from normalization import VariantTrie, find_variant_ingredients, merge_variant_rows
+
+
+class VariantTrieTest(unittest.TestCase):
+
+    def setUp(self):
+        self.trie = VariantTrie()
+        for variant in ("cèpe", "cèpes", "cepe"):
+            self.trie.insert(variant, "cèpe")
+        for variant in ("shii take", "shii takes"):
+            self.trie.insert(variant, "shii-take")
+
+    def test_scan_respecte_les_frontieres_de_mot(self):
+        self.assertEqual(self.trie.scan("précèpe"), [])
+        self.assertEqual(self.trie.scan("cèpelle"), [])
+        self.assertEqual(self.trie.scan("risotto, cèpe."), [(9, 13, "cèpe")])
+
+    def test_scan_pluriels_et_plus_longue_variante(self):
+        self.assertEqual(self.trie.scan("cèpes rôtis"), [(0, 5, "cèpe")])
+        self.assertEqual(self.trie.scan("bouillon shii takes"), [(9, 19, "shii-take")])
+
+    def test_find_variant_ingredients(self):
+        self.assertEqual(
+            find_variant_ingredients("Velouté de Cepes et Shiitakes, cèpe"),
+            [("cèpe", "champignon"), ("shii-take", "champignon")],
+        )
+        # Entrée sans catégorie : renommage seulement, pas de détection
+        self.assertEqual(find_variant_ingredients("Céleri-rave rôti, celeri branche"), [])
+        self.assertEqual(find_variant_ingredients("Cèpes et shiitake", {"cèpe"}), [("cèpe", "champignon")])
+
+
+class MergeVariantRowsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute('''
+            CREATE TABLE ingredients_clean (
+                id INTEGER PRIMARY KEY, plat_id INTEGER, ingredient TEXT, categorie_ingredient TEXT
+            )
+        ''')
+        self.conn.executemany(
+            'INSERT INTO ingredients_clean (id, plat_id, ingredient, categorie_ingredient) VALUES (?, ?, ?, ?)',
+            [
+                (1, 1, 'céleri', 'legume'),
+                (2, 1, 'celeri', 'legume'),      # doublon créé par la fusion → supprimé
+                (3, 2, 'celeri', 'legume'),      # seul au plat 2 → renommé
+                (4, 3, 'cèpes', 'champignon'),
+                (5, 3, 'cepe', 'champignon'),    # deux variantes du même plat → une seule ligne
+                (6, 4, 'cèpe', 'champignon'),
+                (7, 4, 'cèpe', 'champignon'),    # doublon antérieur → conservé
+                (8, 5, 'truffe', 'champignon'),
+            ],
+        )
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_fusion(self):
+        self.assertEqual(merge_variant_rows(self.conn), 4)
+        rows = self.conn.execute('SELECT id, plat_id, ingredient FROM ingredients_clean ORDER BY id').fetchall()
+        self.assertEqual(rows, [
+            (1, 1, 'céleri'),
+            (3, 2, 'céleri'),
+            (4, 3, 'cèpe'),
+            (6, 4, 'cèpe'),
+            (7, 4, 'cèpe'),
+            (8, 5, 'truffe'),
+        ])
+
+    def test_fusion_reprend_la_categorie_du_canonique(self):
+        self.conn.executemany(
+            'INSERT INTO ingredients_clean (id, plat_id, ingredient, categorie_ingredient) VALUES (?, ?, ?, ?)',
+            [(9, 6, 'celeri', 'herbe'), (10, 7, 'cepes', 'legume')],
+        )
+        merge_variant_rows(self.conn)
+        rows = self.conn.execute(
+            'SELECT id, ingredient, categorie_ingredient FROM ingredients_clean WHERE id IN (9, 10) ORDER BY id'
+        ).fetchall()
+        # céleri : renommage seul → catégorie des lignes canoniques ; cèpe : VARIANT_SPELLINGS
+        self.assertEqual(rows, [(9, 'céleri', 'legume'), (10, 'cèpe', 'champignon')])
+
+    def test_sans_variante(self):
+        merge_variant_rows(self.conn)
+        self.assertEqual(merge_variant_rows(self.conn), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
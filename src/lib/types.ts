@@ -57,3 +57,28 @@ export interface Technique {
 export type CategoryFilter = "all" | Category;
 
 export type StarFilter = "all" | "1 étoile" | "2 étoiles" | "3 étoiles" | "Sélectionné";
+
+// Cube pré-agrégé généré par gastronomic_fix.py (filter_cube.json)
+export interface FilterCube {
+  dimensions: {
+    ingredients: string[];
+    stars: string[];
+    categories: string[];
+    cities: string[];
+  };
+  // [ingrédient, étoile, catégorie, ville, fréquence] (indices dans dimensions)
+  cells: [number, number, number, number, number][];
+  // [étoile, ville, nombre de plats]
+  dish_totals: [number, number, number][];
+  dishes_by_star: Record<string, number>;
+  // Clé "<StarFilter>|<CategoryFilter>" → [ingrédient, fréquence] triés
+  views: Record<string, [string, number][]>;
+}
+
+// Série temporelle par ingrédient (trends/<id>.json), points aux dates de changement
+export interface IngredientTrend {
+  id: string;
+  name: string;
+  frequency: DailyDataPoint[];
+  by_stars: Record<string, DailyDataPoint[]>;
+}